@@ -124,7 +124,8 @@ class DynamicLeadScoringApp:
             features_df, debug_info = self.feature_builder.build_features(
                 linkedin_data=linkedin_data,
                 company_data=None,
-                user_data=self.session_state.user_input_data
+                user_data=self.session_state.user_input_data,
+                debug=True
             )
 
             self.session_state.final_features = features_df
@@ -140,13 +141,9 @@ class DynamicLeadScoringApp:
         basic = data.get("basic_info", {})
         exp = data.get("experience", [])
 
-        current_title = ""
-        current_company = ""
-        for e in exp:
-            if e.get("is_current", False):
-                current_title = e.get("title", "")
-                current_company = e.get("company", "")
-                break
+        current = next((e for e in exp if e.get("is_current", False)), {})
+        current_title = current.get("title", "")
+        current_company = current.get("company", "")
 
         col1, col2 = st.columns(2)
         with col1:
@@ -3,42 +3,85 @@ Apify LinkedIn Extractor
 - Extracts profile details from Apify actor: apimaestro~linkedin-profile-detail
 - Extracts recent posts from Apify actor: apimaestro~linkedin-batch-profile-posts-scraper
 - Computes activity_days based on most recent post
+- Profile and posts actors run concurrently (independent HTTP calls)
+- Extracted profiles are cached per URL for a day (re-scoring skips Apify)
 """
 
+import re
+import copy
 import requests
+import threading
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, List
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple
+
+
+# linkedin.com/in/<username>, ending at the next "/", query or fragment
+_USERNAME_RE = re.compile(r"linkedin\.com/in/([^/?#]*)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _username_from_url(url: str) -> Optional[str]:
+    m = _USERNAME_RE.search(url)
+    if m:
+        return m.group(1).strip()
+    return None
 
 
 class LinkedInAPIExtractor:
+    # normalized linkedin_url -> (fetched_at, profile dict); class level so it
+    # survives Streamlit reruns, which build a new extractor each time
+    _PROFILE_CACHE: Dict[str, Tuple[float, Dict]] = {}
+    _PROFILE_CACHE_TTL = 24 * 60 * 60
+    _PROFILE_CACHE_MAX = 512
+    # extract_profiles reads/evicts from worker threads
+    _PROFILE_CACHE_LOCK = threading.Lock()
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.apify.com/v2"
         self.profile_actor_id = "apimaestro~linkedin-profile-detail"
         self.posts_actor_id = "apimaestro~linkedin-batch-profile-posts-scraper"
 
+        # One pooled session for every Apify call: status polls reuse the
+        # TLS connection instead of a fresh handshake each time. Retry only
+        # covers idempotent GETs (urllib3 default), so actor runs never double-start.
+        # raise_on_status=False hands the last 5xx back as a response, so the
+        # status_code checks below still decide (poll again / return None).
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {self.api_key}"
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False,
+            ),
+        )
+        self._session.mount("https://", adapter)
+
+    @staticmethod
+    def _normalize_url(linkedin_url: str) -> str:
+        return linkedin_url.strip().lower().split("?")[0].rstrip("/")
+
     def _extract_username(self, linkedin_url: str) -> Optional[str]:
         if not linkedin_url:
             return None
 
-        url = linkedin_url.strip()
-
         # Accept both linkedin.com/in/xxx and full URLs
-        if "linkedin.com/in/" in url:
-            username = url.split("linkedin.com/in/")[1].split("/")[0].split("?")[0]
-            return username.strip()
-        return None
+        return _username_from_url(linkedin_url.strip())
 
     def _start_profile_actor(self, username: str) -> Optional[Dict]:
         endpoint = f"{self.base_url}/acts/{self.profile_actor_id}/runs"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {"username": username, "includeEmail": False}
 
-        resp = requests.post(endpoint, headers=headers, json=payload, timeout=30)
+        resp = self._session.post(endpoint, json=payload, timeout=30)
         if resp.status_code == 201:
             data = resp.json()["data"]
             return {"run_id": data["id"], "dataset_id": data["defaultDatasetId"]}
@@ -47,24 +90,26 @@ class LinkedInAPIExtractor:
     def _wait_for_run(self, run_id: str, timeout: int = 180) -> bool:
         start = time.time()
         endpoint = f"{self.base_url}/actor-runs/{run_id}"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
 
+        attempt = 0
         while time.time() - start < timeout:
-            r = requests.get(endpoint, headers=headers, timeout=15)
+            r = self._session.get(endpoint, timeout=15)
             if r.status_code == 200:
                 status = r.json()["data"]["status"]
                 if status == "SUCCEEDED":
                     return True
                 if status in ("FAILED", "TIMED_OUT", "ABORTED"):
                     return False
-            time.sleep(3)
+            # back off 0.5s, 0.8s, 1.3s ... capped at 8s: fast runs are
+            # noticed quickly, slow runs don't poll more often than before
+            time.sleep(min(8.0, 0.5 * (1.6 ** attempt)))
+            attempt += 1
 
         return False
 
     def _fetch_dataset_items(self, dataset_id: str) -> Optional[List[Dict]]:
         endpoint = f"{self.base_url}/datasets/{dataset_id}/items"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        r = requests.get(endpoint, headers=headers, timeout=30)
+        r = self._session.get(endpoint, timeout=30)
         if r.status_code == 200:
             items = r.json()
             if isinstance(items, list):
@@ -96,6 +141,14 @@ class LinkedInAPIExtractor:
         Scrape recent posts from LinkedIn using Apify posts actor.
         Returns latest posts sorted by timestamp desc.
         """
+        posts = self._fetch_recent_posts(profile_url, limit)
+        return posts if posts is not None else []
+
+    def _fetch_recent_posts(self, profile_url: str, limit: int = 2) -> Optional[List[Dict]]:
+        """
+        Same as extract_recent_posts, but None when the call failed
+        (error, timeout, non-2xx) as opposed to [] for "no posts".
+        """
         try:
             endpoint = (
                 f"{self.base_url}/acts/{self.posts_actor_id}/run-sync-get-dataset-items"
@@ -103,15 +156,14 @@ class LinkedInAPIExtractor:
             )
 
             payload = {"includeEmail": False, "usernames": [profile_url.strip()]}
-            headers = {"Content-Type": "application/json"}
 
-            response = requests.post(endpoint, json=payload, headers=headers, timeout=90)
+            response = self._session.post(endpoint, json=payload, timeout=90)
             if response.status_code not in (200, 201):
-                return []
+                return None
 
             data = response.json()
             if not isinstance(data, list):
-                return []
+                return None
 
             def get_ts(post: Dict) -> int:
                 try:
@@ -123,7 +175,7 @@ class LinkedInAPIExtractor:
             return data[:limit]
 
         except Exception:
-            return []
+            return None
 
     def compute_activity_days_from_posts(self, posts: List[Dict]) -> Optional[int]:
         """
@@ -154,15 +206,58 @@ class LinkedInAPIExtractor:
         if not username:
             return None
 
-        profile_data = self._run_profile_actor(username)
-        if not profile_data:
-            return None
+        cache_key = self._normalize_url(linkedin_url)
+        with self._PROFILE_CACHE_LOCK:
+            cached = self._PROFILE_CACHE.get(cache_key)
+        if cached and time.time() - cached[0] < self._PROFILE_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+
+        # Both actors take tens of seconds and don't depend on each other,
+        # so the posts scrape runs while the profile actor is polled. The
+        # trade-off: a failed profile (private, actor error) still spends
+        # one posts run, which baseline skipped.
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            posts_future = pool.submit(self._fetch_recent_posts, linkedin_url, 2)
+            profile_data = self._run_profile_actor(username)
+            if not profile_data:
+                return None
+            posts = posts_future.result()
+        finally:
+            # a failed profile returns right away instead of waiting out the
+            # in-flight posts call (it finishes in the background)
+            pool.shutdown(wait=False)
+
+        # A failed posts call (None) is not "no posts": the profile is still
+        # returned, but not cached, so the next extract retries the posts
+        posts_ok = posts is not None
+        if not posts_ok:
+            posts = []
 
         # Attach posts + activity_days
-        posts = self.extract_recent_posts(linkedin_url, limit=2)
         activity_days = self.compute_activity_days_from_posts(posts)
 
         profile_data["recent_posts"] = posts
         profile_data["activity_days"] = activity_days
 
+        if posts_ok:
+            entry = (time.time(), copy.deepcopy(profile_data))
+            with self._PROFILE_CACHE_LOCK:
+                cache = self._PROFILE_CACHE
+                cache.pop(cache_key, None)
+                if len(cache) >= self._PROFILE_CACHE_MAX:
+                    cache.pop(next(iter(cache)), None)  # oldest entry
+                cache[cache_key] = entry
+
         return profile_data
+
+    def extract_profiles(self, linkedin_urls: List[str], max_workers: int = 8) -> List[Optional[Dict]]:
+        """
+        Extract many profiles concurrently (same order as linkedin_urls).
+        max_workers caps parallel Apify runs; too many cause actor timeouts.
+        """
+        if not linkedin_urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(linkedin_urls)))) as pool:
+            return list(pool.map(self.extract_profile, linkedin_urls))
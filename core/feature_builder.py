@@ -6,27 +6,326 @@ Dynamic Feature Builder (Patched)
 - Returns (features_df, debug_info)
 """
 
+import os
 import re
+import json
+import math
 import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Optional
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
+
+__all__ = ["DynamicFeatureBuilder", "FEATURE_COLUMNS"]
+
+
+# Precompiled tables for the size / revenue parsers (one pass per step)
+_SIZE_STRIP = str.maketrans("", "", ",")
+_REVENUE_STRIP = str.maketrans("", "", ",$")
+_NUMBER_RE = re.compile(r"([0-9]*\.?[0-9]+)")
+# Unit = first alphabetic run after the number, scaled by its first letter
+# (B... billions, M... millions, K... / THOUSAND... thousands), so spellings
+# like BLN, BB, MM or "billions" need no table entry of their own
+_REVENUE_UNIT_RE = re.compile(r"[A-Z]+")
+_REVENUE_SCALE = {"B": 1000.0, "M": 1.0, "K": 0.001}
+
+# Company size / revenue strings repeat heavily across a prospect list and
+# the parsers are pure, so both are memoised
+@lru_cache(maxsize=4096)
+def _parse_size_to_number(size_str: str) -> int:
+    """
+    Converts:
+    "201-500 employees" -> 350
+    "5,001-10,000 employees" -> 7500
+    "10,000+" -> 10000
+    """
+    if not size_str:
+        return 0
+
+    # plain str.replace beats a regex sub on these short strings;
+    # no .strip() anywhere since float() already ignores surrounding spaces
+    s = str(size_str).lower().replace("employees", "").replace("employee", "")
+    s = s.translate(_SIZE_STRIP)
+
+    # "10000+"
+    if "+" in s:
+        try:
+            return int(float(s.replace("+", "")))
+        except:
+            return 0
+
+    # "5001-10000"
+    if "-" in s:
+        try:
+            a, b = s.split("-", 1)
+            return int((float(a) + float(b)) / 2)
+        except:
+            return 0
+
+    # numeric only
+    try:
+        return int(float(s))
+    except:
+        return 0
+
+
+@lru_cache(maxsize=4096)
+def _parse_revenue_millions(revenue_str: str) -> float:
+    """
+    Converts revenue into MILLIONS:
+    "$261.9 Million" -> 261.9
+    "$1 Billion" -> 1000
+    "$1.3 Billion" -> 1300
+    "$128.9M" -> 128.9
+    "$2.5B" -> 2500
+    "$2.5BB" -> 2500
+    "$1.2bln" -> 1200
+    "$1.2 billions" -> 1200
+    "$3 millions" -> 3
+    "$500K" -> 0.5
+    "$10M (Bank)" -> 10  (only the word right after the number counts, not any B/M)
+    """
+    if not revenue_str:
+        return 0.0
+
+    s = str(revenue_str).upper().translate(_REVENUE_STRIP)
+
+    # Extract first numeric value
+    match = _NUMBER_RE.search(s)
+    if not match:
+        return 0.0
+
+    val = float(match.group(1))
+
+    # Scale by the first word after the number ("1-5 Billion" -> BILLION);
+    # if no unit given assume already in millions
+    unit = _REVENUE_UNIT_RE.search(s, match.end())
+    if unit:
+        word = unit.group()
+        if word.startswith("THOUSAND"):
+            return val * 0.001
+        return val * _REVENUE_SCALE.get(word[0], 1.0)
+    return val
+
+
+# Title keyword flags: (feature name, keywords, seniority weight, dept weight).
+# Keywords are regex alternatives: r"\bword\b" entries are looked up in the
+# title's word tokens, plain literals are substring checks, and anything
+# else (r"\bv\.p\.\b") keeps its own regex.
+_TITLE_FLAGS = (
+    # seniority
+    ("is_ceo", (r"\bceo\b", "chief executive", "president"), 5, 0),
+    ("is_c_level", (r"\bchief\b", "cto", "cfo", "cio", "cro", "cmo"), 4, 0),
+    ("is_evp_svp", (r"\bevp\b", r"\bsvp\b", "executive vice president", "senior vice president"), 3, 0),
+    ("is_vp", ("vice president", r"\bvp\b", r"\bv\.p\.\b"), 2, 0),
+    ("is_director", ("director", "head of"), 2, 0),
+    ("is_manager", ("manager", "lead", "supervisor"), 1, 0),
+    ("is_officer", ("officer", "avp", "assistant vice president"), 1, 0),
+    # department
+    ("in_lending", ("lend", "mortgage", "loan", "credit", "origination", "abl"), 0, 2),
+    ("in_tech", ("tech", "technology", "it", "digital", "data", "analytics", "ai", "software"), 0, 1),
+    ("in_operations", ("operat", "process", "delivery", "service", "support"), 0, 1),
+    ("in_risk", ("risk", "compliance", "security", "audit"), 0, 2),
+    ("in_finance", ("finance", "fpa", "treasury"), 0, 2),
+    ("in_strategy", ("strategy", "transformation", "innovation", "growth"), 0, 1),
+)
+
+_WORD_KEYWORD_RE = re.compile(r"\\b(\w+)\\b")
+_REGEX_META_RE = re.compile(r"[\\.^$*+?{}\[\]|()]")
+# \W+ splits exactly where \b sits, so "\bceo\b" <=> "ceo" in tokens
+_TITLE_TOKEN_RE = re.compile(r"\W+")
+
+
+def _compile_title_keywords(keywords: Tuple[str, ...]):
+    """Split one flag's keywords into (word set, substrings, residual regex)."""
+    words, substrings, patterns = set(), [], []
+    for kw in keywords:
+        m = _WORD_KEYWORD_RE.fullmatch(kw)
+        if m:
+            words.add(m.group(1))
+        elif not _REGEX_META_RE.search(kw):
+            substrings.append(kw)
+        else:
+            patterns.append(kw)
+    residual = re.compile("|".join(patterns)) if patterns else None
+    return frozenset(words), tuple(substrings), residual
+
+
+_TITLE_MATCHERS = tuple(_compile_title_keywords(kws) for _, kws, _, _ in _TITLE_FLAGS)
+
+# All title keywords fused into one alternation. A finditer over it would
+# report non-overlapping matches only ("vice president" hides the
+# "president" that sets is_ceo), so it is used as a single-scan pre-screen:
+# titles with no keyword at all skip the per-flag checks.
+_TITLE_ANY_RE = re.compile("|".join(kw for _, kws, _, _ in _TITLE_FLAGS for kw in kws))
+
+
+@lru_cache(maxsize=4096)
+def _scan_title(title_l: str) -> Tuple[int, int, int]:
+    """
+    Classify a lowercased title in one call:
+    (flag bitmask over _TITLE_FLAGS, seniority_score, dept_score).
+    Titles repeat across leads, so results are memoised.
+    """
+    title_mask = 0
+    seniority_score = 0
+    dept_score = 0
+    if _TITLE_ANY_RE.search(title_l):
+        tokens = set(_TITLE_TOKEN_RE.split(title_l))
+        contains = title_l.__contains__
+        for bit, (words, substrings, residual) in enumerate(_TITLE_MATCHERS):
+            if (
+                not tokens.isdisjoint(words)
+                or any(map(contains, substrings))
+                or (residual is not None and residual.search(title_l))
+            ):
+                _, _, seniority_w, dept_w = _TITLE_FLAGS[bit]
+                title_mask |= 1 << bit
+                seniority_score += seniority_w
+                dept_score += dept_w
+    return title_mask, seniority_score, dept_score
+
+
+# Industry flags: (feature name, alternatives); a flag is set when every
+# keyword of any one alternative occurs in the lowercased industry
+_INDUSTRY_RULES = (
+    ("is_consumer_lending", (("consumer", "lend"),)),
+    ("is_commercial_banking", (("commercial",), ("corporate banking",))),
+    ("is_retail_banking", (("retail",), ("personal banking",))),
+    ("is_fintech", (("fintech",), ("digital bank",))),
+    ("is_credit_union", (("credit union",), ("cooperative",))),
+)
+
+
+@lru_cache(maxsize=1024)
+def _classify_industry(industry_l: str) -> Tuple[int, ...]:
+    """Industry strings repeat heavily, so each one is classified once."""
+    contains = industry_l.__contains__
+    return tuple(
+        int(any(all(map(contains, kws)) for kws in alternatives))
+        for _, alternatives in _INDUSTRY_RULES
+    )
+
+
+# Bucket edges shared by the scalar (bisect) and batch (np.searchsorted)
+# paths; they encode the training thresholds:
+#   revenue_category 0 <20M, 1 20-50M, 2 50-100M, 3 100-500M, 4 500M+
+#   Size_Score       0 <51, 1 51-200, 2 201-500, 3 501-1000, 4 1001-4999, 5 5000+
+#   Activity_Score   5 <=7d, 4 <=14d, 3 <=30d, 2 <=90d, 1 <=180d, 0 beyond
+_REVENUE_BINS = (20.0, 50.0, 100.0, 500.0)
+_SIZE_SCORE_BINS = (51, 201, 501, 1001, 5000)
+_ACTIVITY_SCORE_BINS = (7.0, 14.0, 30.0, 90.0, 180.0)
+
+
+def _score_kernel(size_numeric: int, revenue_millions: float, activity_days: float) -> Tuple[int, ...]:
+    """
+    Pure scalar bucketing/scoring shared by build_features. Returns
+    (size_51_200, size_201_500, size_501_1000, size_1001_5000, size_5000_plus,
+     Size_Score, revenue_category, Revenue_Score,
+     is_active_week, is_active_month, Activity_Score).
+    """
+    size_score = bisect_right(_SIZE_SCORE_BINS, size_numeric)
+    # one-hots follow the bucket, except 5000 sits in both of the top two
+    size_flags = (
+        int(size_score == 1),
+        int(size_score == 2),
+        int(size_score == 3),
+        int(size_score == 4 or size_numeric == 5000),
+        int(size_score == 5),
+    )
+
+    revenue_category = bisect_right(_REVENUE_BINS, revenue_millions)
+    revenue_score = revenue_category + 1 if revenue_millions > 0 else 0
+
+    activity_score = 5 - bisect_left(_ACTIVITY_SCORE_BINS, activity_days)
+
+    return size_flags + (
+        size_score, revenue_category, revenue_score,
+        int(activity_days <= 7), int(activity_days <= 30), activity_score,
+    )
+
+
+# Feature columns fed by each input block; a block whose columns the model
+# never reads is skipped in build_features
+_TITLE_COLUMNS = tuple(name for name, _, _, _ in _TITLE_FLAGS) + (
+    "seniority_score", "dept_score", "Desig_Score",
+)
+_SIZE_COLUMNS = (
+    "size_numeric", "size_51_200", "size_201_500", "size_501_1000",
+    "size_1001_5000", "size_5000_plus", "Size_Score",
+)
+_REVENUE_COLUMNS = ("revenue_millions", "revenue_category", "Revenue_Score")
+_INDUSTRY_COLUMNS = tuple(name for name, _ in _INDUSTRY_RULES)
+
+# Full feature order produced when no metadata narrows it
+FEATURE_COLUMNS: Tuple[str, ...] = tuple(name for name, _, _, _ in _TITLE_FLAGS) + (
+    "designation_length", "designation_word_count",
+    "seniority_score", "dept_score",
+    "size_numeric", "size_51_200", "size_201_500", "size_501_1000",
+    "size_1001_5000", "size_5000_plus",
+    "revenue_millions", "revenue_category",
+    "activity_days", "is_active_week", "is_active_month",
+) + _INDUSTRY_COLUMNS + (
+    "Desig_Score", "Size_Score", "Revenue_Score", "Activity_Score",
+    "activity_missing",
+)
+
+# Title flag score weights as vectors for the batch path
+_SENIORITY_WEIGHTS = np.array([w for _, _, w, _ in _TITLE_FLAGS], dtype=np.int64)
+_DEPT_WEIGHTS = np.array([w for _, _, _, w in _TITLE_FLAGS], dtype=np.int64)
+
+# Batch column dtypes; everything else is a 0/1 flag or 0-5 bucket (int8)
+_BATCH_DTYPES = {
+    "designation_length": np.int16,
+    "designation_word_count": np.int16,
+    "seniority_score": np.int16,
+    "dept_score": np.int16,
+    "Desig_Score": np.int16,
+    # float32 like build_features: an int cast would wrap huge sizes
+    "size_numeric": np.float32,
+    "revenue_millions": np.float32,
+    "activity_days": np.float32,
+}
 
 
 class DynamicFeatureBuilder:
+    # metadata_path -> (mtime, feature_names)
+    _FEATURES_CACHE: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+
     def __init__(self, metadata_path: str = "models/metadata.json"):
         self.metadata_path = metadata_path
         self.model_feature_names = self._load_feature_names()
 
+        # No metadata -> build everything
+        needed = set(self.model_feature_names)
+        self._need_title = not needed or not needed.isdisjoint(_TITLE_COLUMNS)
+        self._need_size = not needed or not needed.isdisjoint(_SIZE_COLUMNS)
+        self._need_revenue = not needed or not needed.isdisjoint(_REVENUE_COLUMNS)
+        self._need_industry = not needed or not needed.isdisjoint(_INDUSTRY_COLUMNS)
+
+        # Column template reused by every build_features call
+        self._columns = pd.Index(self.model_feature_names or FEATURE_COLUMNS)
+
     # ----------------------------
     # Metadata
     # ----------------------------
     def _load_feature_names(self):
+        """
+        Feature names are cached per metadata path at class level, so new
+        builders skip the JSON read until the file's mtime changes.
+        """
         try:
-            import json, os
-            if os.path.exists(self.metadata_path):
-                with open(self.metadata_path, "r") as f:
-                    meta = json.load(f)
-                return meta.get("feature_names", [])
+            # missing file -> OSError -> []
+            mtime = os.stat(self.metadata_path).st_mtime
+            cached = DynamicFeatureBuilder._FEATURES_CACHE.get(self.metadata_path)
+            if cached is not None and cached[0] == mtime:
+                return list(cached[1])
+
+            with open(self.metadata_path, "r") as f:
+                meta = json.load(f)
+            names = meta.get("feature_names", [])
+            DynamicFeatureBuilder._FEATURES_CACHE[self.metadata_path] = (mtime, tuple(names))
+            return names
         except:
             pass
         return []
@@ -35,7 +334,7 @@ class DynamicFeatureBuilder:
     # Helpers
     # ----------------------------
     def _safe_lower(self, x) -> str:
-        if x is None or (isinstance(x, float) and np.isnan(x)):
+        if x is None or (isinstance(x, float) and math.isnan(x)):
             return ""
         return str(x).lower().strip()
 
@@ -49,137 +348,86 @@ class DynamicFeatureBuilder:
         headline = basic.get("headline", "")
         title = headline or ""
 
-        exp = linkedin_data.get("experience", [])
-        if isinstance(exp, list) and len(exp) > 0:
-            for e in exp:
-                if e.get("is_current", False) and e.get("title"):
-                    title = e.get("title")
-                    break
+        # first current role with a title wins over the headline
+        exp = linkedin_data.get("experience")
+        if isinstance(exp, list):
+            title = next(
+                (e["title"] for e in exp if e.get("is_current") and e.get("title")),
+                title,
+            )
 
         return title
 
+    # str() before the cached parsers: a list/dict from a malformed payload
+    # would be unhashable, and the parsers str() their input anyway
     def _parse_size_to_number(self, size_str: str) -> int:
-        """
-        Converts:
-        "201-500 employees" -> 350
-        "5,001-10,000 employees" -> 7500
-        "10,000+" -> 10000
-        """
-        if not size_str:
-            return 0
-
-        s = str(size_str).lower()
-        s = s.replace("employees", "").replace("employee", "").strip()
-        s = s.replace(",", "").strip()
-
-        # "10000+"
-        if "+" in s:
-            try:
-                return int(float(s.replace("+", "").strip()))
-            except:
-                return 0
-
-        # "5001-10000"
-        if "-" in s:
-            try:
-                a, b = s.split("-", 1)
-                a = float(a.strip())
-                b = float(b.strip())
-                return int((a + b) / 2)
-            except:
-                return 0
-
-        # numeric only
-        try:
-            return int(float(s))
-        except:
-            return 0
+        return _parse_size_to_number(str(size_str)) if size_str else 0
 
     def _parse_revenue_millions(self, revenue_str: str) -> float:
+        return _parse_revenue_millions(str(revenue_str)) if revenue_str else 0.0
+
+    # ----------------------------
+    # Main Feature Builder
+    # ----------------------------
+    def build_features(
+        self,
+        linkedin_data: dict,
+        company_data: dict = None,
+        user_data: dict = None,
+        debug: bool = False
+    ) -> Tuple[pd.DataFrame, Optional[Dict]]:
         """
-        Converts revenue into MILLIONS:
-        "$261.9 Million" -> 261.9
-        "$1 Billion" -> 1000
-        "$1.3 Billion" -> 1300
-        "$128.9M" -> 128.9
-        "$2.5B" -> 2500
+        Returns:
+          features_df (single-row DataFrame)
+          debug_info dict (values before model), or None unless debug=True
         """
-        if not revenue_str:
-            return 0.0
-
-        s = str(revenue_str).upper().strip()
-        s = s.replace(",", "").replace("$", "").strip()
-
-        # FIX: handle words Billion/Million
-        s = s.replace("BILLION", "B")
-        s = s.replace("MILLION", "M")
+        columns, values, debug_info = self._build_row(linkedin_data, user_data, debug)
 
-        # Extract first numeric value
-        match = re.search(r"([0-9]*\.?[0-9]+)", s)
-        if not match:
-            return 0.0
-
-        val = float(match.group(1))
-
-        # Determine scale
-        if "B" in s:
-            return val * 1000
-        if "M" in s:
-            return val
-
-        # If no unit given assume already in millions
-        return val
+        # one float32 block (the dtype XGBoost consumes) instead of letting
+        # pandas infer a 64-bit dtype per column
+        features_df = pd.DataFrame(
+            np.array([values], dtype=np.float32), columns=columns, copy=False
+        )
+        return features_df, debug_info
 
-    def _get_revenue_category(self, revenue_millions: float) -> int:
+    def build_feature_vector(
+        self,
+        linkedin_data: dict,
+        company_data: dict = None,
+        user_data: dict = None,
+        debug: bool = False
+    ) -> Tuple[np.ndarray, Optional[Dict]]:
         """
-        Must match training encoding logic:
-        0 <20M
-        1 20-50M
-        2 50-100M
-        3 100-500M
-        4 500M+
+        Same features as build_features, without the DataFrame:
+          feature vector (float32, model_feature_names order)
+          debug_info dict, or None unless debug=True
         """
-        if revenue_millions < 20:
-            return 0
-        elif revenue_millions < 50:
-            return 1
-        elif revenue_millions < 100:
-            return 2
-        elif revenue_millions < 500:
-            return 3
-        else:
-            return 4
+        _, values, debug_info = self._build_row(linkedin_data, user_data, debug)
+        return np.array(values, dtype=np.float32), debug_info
 
-    def _compute_activity_score(self, activity_days: float) -> int:
+    def build_feature_dict(
+        self,
+        linkedin_data: dict,
+        company_data: dict = None,
+        user_data: dict = None,
+        debug: bool = False
+    ) -> Tuple[Dict[str, float], Optional[Dict]]:
         """
-        Convert activity_days into Activity_Score similar to your dataset pattern.
-        Lower days => higher score
+        Same features as build_features, as plain scalars:
+          {feature_name: value} in model_feature_names order
+          debug_info dict, or None unless debug=True
         """
-        if activity_days <= 7:
-            return 5
-        elif activity_days <= 14:
-            return 4
-        elif activity_days <= 30:
-            return 3
-        elif activity_days <= 90:
-            return 2
-        elif activity_days <= 180:
-            return 1
-        return 0
+        columns, values, debug_info = self._build_row(linkedin_data, user_data, debug)
+        return dict(zip(columns, values)), debug_info
 
-    # ----------------------------
-    # Main Feature Builder
-    # ----------------------------
-    def build_features(
+    def _build_row(
         self,
         linkedin_data: dict,
-        company_data: dict = None,
-        user_data: dict = None
-    ) -> Tuple[pd.DataFrame, Dict]:
+        user_data: dict,
+        debug: bool
+    ) -> Tuple[pd.Index, List, Optional[Dict]]:
         """
-        Returns:
-          features_df (single-row DataFrame)
-          debug_info dict (values before model)
+        Returns (columns, values in column order, debug_info or None).
         """
 
         if user_data is None:
@@ -194,132 +442,102 @@ class DynamicFeatureBuilder:
         annual_revenue = user_data.get("annual_revenue", "") or ""
         industry = user_data.get("industry", "") or ""
 
+        # ---- Activity Days (raw) ----
+        activity_days_raw = None
+        if linkedin_data:
+            activity_days_raw = linkedin_data.get("activity_days", None)
+
+        # ---- Features ----
+        columns, values, activity_days_final, activity_missing = self._compute_row_values(
+            title, company_size, annual_revenue, industry, activity_days_raw
+        )
+
+        if not debug:
+            return columns, values, None
+
+        # Debug info
+        debug_info = {
+            "title": title,
+            "company_name": company_name,
+            "company_size_raw": company_size,
+            "annual_revenue_raw": annual_revenue,
+            "industry_raw": industry,
+            "activity_days_raw": activity_days_raw,
+            "activity_days_final_used": activity_days_final,
+            "activity_missing": activity_missing,
+        }
+
+        # add all model feature values (straight from the row, no iloc)
+        debug_info.update(zip(columns, values))
+
+        return columns, values, debug_info
+
+    def _compute_row_values(
+        self,
+        title,
+        company_size,
+        annual_revenue,
+        industry,
+        activity_days_raw
+    ) -> Tuple[pd.Index, List, float, int]:
+        """
+        Pure feature computation from the raw inputs.
+        Returns (columns, values in column order, activity_days_final, activity_missing).
+        """
+
         # ---- Normalize text ----
         title_l = self._safe_lower(title)
-        industry_l = self._safe_lower(industry)
-
-        # ---- Seniority flags ----
-        is_ceo = int(bool(re.search(r"\bceo\b|chief executive|president", title_l)))
-        is_c_level = int(bool(re.search(r"\bchief\b|cto|cfo|cio|cro|cmo", title_l)))
-        is_evp_svp = int(bool(re.search(r"\bevp\b|\bsvp\b|executive vice president|senior vice president", title_l)))
-        is_vp = int(bool(re.search(r"vice president|\bvp\b|\bv\.p\.\b", title_l)))
-        is_director = int(bool(re.search(r"director|head of", title_l)))
-        is_manager = int(bool(re.search(r"manager|lead|supervisor", title_l)))
-        is_officer = int(bool(re.search(r"officer|avp|assistant vice president", title_l)))
-
-        # ---- Department flags ----
-        in_lending = int(bool(re.search(r"lend|mortgage|loan|credit|origination|abl", title_l)))
-        in_tech = int(bool(re.search(r"tech|technology|it|digital|data|analytics|ai|software", title_l)))
-        in_operations = int(bool(re.search(r"operat|process|delivery|service|support", title_l)))
-        in_risk = int(bool(re.search(r"risk|compliance|security|audit", title_l)))
-        in_finance = int(bool(re.search(r"finance|fpa|treasury", title_l)))
-        in_strategy = int(bool(re.search(r"strategy|transformation|innovation|growth", title_l)))
+        industry_l = self._safe_lower(industry) if self._need_industry else ""
+
+        # ---- Seniority / department flags (bit i <-> _TITLE_FLAGS[i]) ----
+        if self._need_title:
+            title_mask, seniority_score, dept_score = _scan_title(title_l)
+        else:
+            title_mask, seniority_score, dept_score = 0, 0, 0
 
         designation_length = len(title_l)
         designation_word_count = len(title_l.split()) if title_l else 0
 
-        # ---- Seniority score / dept score ----
-        seniority_score = (
-            is_ceo * 5 +
-            is_c_level * 4 +
-            is_evp_svp * 3 +
-            is_vp * 2 +
-            is_director * 2 +
-            is_manager * 1 +
-            is_officer * 1
-        )
-
-        dept_score = (
-            in_lending * 2 +
-            in_finance * 2 +
-            in_risk * 2 +
-            in_strategy * 1 +
-            in_operations * 1 +
-            in_tech * 1
-        )
-
         # ---- Company size ----
-        size_numeric = self._parse_size_to_number(company_size)
-
-        size_51_200 = int(51 <= size_numeric <= 200)
-        size_201_500 = int(201 <= size_numeric <= 500)
-        size_501_1000 = int(501 <= size_numeric <= 1000)
-        size_1001_5000 = int(1001 <= size_numeric <= 5000)
-        size_5000_plus = int(size_numeric >= 5000)
+        size_numeric = self._parse_size_to_number(company_size) if self._need_size else 0
 
         # ---- Revenue ----
-        revenue_millions = self._parse_revenue_millions(annual_revenue)
-        revenue_category = self._get_revenue_category(revenue_millions)
+        revenue_millions = self._parse_revenue_millions(annual_revenue) if self._need_revenue else 0.0
 
         # ---- Activity Days ----
-        activity_days_raw = None
-        activity_days_final = None
-
-        if linkedin_data:
-            activity_days_raw = linkedin_data.get("activity_days", None)
-
         # If activity missing -> neutral fallback + flag
         activity_missing = 0
         try:
             activity_days_final = float(activity_days_raw)
         except:
-            activity_days_final = np.nan
+            activity_days_final = math.nan
 
-        if np.isnan(activity_days_final):
+        # scalar path: plain Python instead of numpy ufuncs
+        if math.isnan(activity_days_final):
             activity_missing = 1
             activity_days_final = 30.0  # neutral fallback
 
         # clip
-        activity_days_final = float(np.clip(activity_days_final, 0, 180))
-
-        is_active_week = int(activity_days_final <= 7)
-        is_active_month = int(activity_days_final <= 30)
+        activity_days_final = min(180.0, max(0.0, activity_days_final))
 
         # ---- Industry flags ----
-        is_consumer_lending = int("consumer" in industry_l and "lend" in industry_l)
-        is_commercial_banking = int("commercial" in industry_l or "corporate banking" in industry_l)
-        is_retail_banking = int("retail" in industry_l or "personal banking" in industry_l)
-        is_fintech = int("fintech" in industry_l or "digital bank" in industry_l)
-        is_credit_union = int("credit union" in industry_l or "cooperative" in industry_l)
+        industry_flags = _classify_industry(industry_l)
 
         # ---- Dataset score columns (dynamic calc) ----
         # These should not be hardcoded. They are computed from real extracted data.
-        Desig_Score = int(seniority_score + dept_score)
-        Size_Score = (
-            5 if size_numeric >= 5000 else
-            4 if size_numeric >= 1001 else
-            3 if size_numeric >= 501 else
-            2 if size_numeric >= 201 else
-            1 if size_numeric >= 51 else
-            0
-        )
-        Revenue_Score = (
-            5 if revenue_millions >= 500 else
-            4 if revenue_millions >= 100 else
-            3 if revenue_millions >= 50 else
-            2 if revenue_millions >= 20 else
-            1 if revenue_millions > 0 else
-            0
-        )
-        Activity_Score = self._compute_activity_score(activity_days_final)
+        (
+            size_51_200, size_201_500, size_501_1000, size_1001_5000, size_5000_plus,
+            Size_Score, revenue_category, Revenue_Score,
+            is_active_week, is_active_month, Activity_Score,
+        ) = _score_kernel(size_numeric, revenue_millions, activity_days_final)
+        Desig_Score = seniority_score + dept_score
 
         # ---- Final feature row ----
         row = {
-            "is_ceo": int(is_ceo),
-            "is_c_level": int(is_c_level),
-            "is_evp_svp": int(is_evp_svp),
-            "is_vp": int(is_vp),
-            "is_director": int(is_director),
-            "is_manager": int(is_manager),
-            "is_officer": int(is_officer),
-
-            "in_lending": int(in_lending),
-            "in_tech": int(in_tech),
-            "in_operations": int(in_operations),
-            "in_risk": int(in_risk),
-            "in_finance": int(in_finance),
-            "in_strategy": int(in_strategy),
-
+            name: (title_mask >> bit) & 1
+            for bit, (name, _, _, _) in enumerate(_TITLE_FLAGS)
+        }
+        row.update({
             "designation_length": int(designation_length),
             "designation_word_count": int(designation_word_count),
 
@@ -340,11 +558,7 @@ class DynamicFeatureBuilder:
             "is_active_week": int(is_active_week),
             "is_active_month": int(is_active_month),
 
-            "is_consumer_lending": int(is_consumer_lending),
-            "is_commercial_banking": int(is_commercial_banking),
-            "is_retail_banking": int(is_retail_banking),
-            "is_fintech": int(is_fintech),
-            "is_credit_union": int(is_credit_union),
+            **dict(zip(_INDUSTRY_COLUMNS, industry_flags)),
 
             "Desig_Score": int(Desig_Score),
             "Size_Score": int(Size_Score),
@@ -353,31 +567,125 @@ class DynamicFeatureBuilder:
 
             # NEW (must retrain model if used)
             "activity_missing": int(activity_missing),
-        }
+        })
 
-        features_df = pd.DataFrame([row])
+        # Ensure feature columns match model (missing -> 0)
+        columns = self._columns
+        values = [row.get(col, 0) for col in columns]
 
-        # Ensure feature columns match model
-        if self.model_feature_names:
-            for col in self.model_feature_names:
-                if col not in features_df.columns:
-                    features_df[col] = 0
-            features_df = features_df[self.model_feature_names]
+        return columns, values, activity_days_final, activity_missing
 
-        # Debug info
-        debug_info = {
-            "title": title,
-            "company_name": company_name,
-            "company_size_raw": company_size,
-            "annual_revenue_raw": annual_revenue,
-            "industry_raw": industry,
-            "activity_days_raw": activity_days_raw,
-            "activity_days_final_used": activity_days_final,
-            "activity_missing": activity_missing,
+    # ----------------------------
+    # Batch Feature Builder
+    # ----------------------------
+    def build_features_batch(self, records: List[Dict]) -> pd.DataFrame:
+        """
+        Build features for many leads at once.
+        records: list of {"linkedin_data": ..., "user_data": ...} dicts
+        (same inputs as build_features).
+        Strings are parsed per lead (memoised title/industry scans); bucketing,
+        flags and scores run as NumPy array ops and the DataFrame is built once.
+        """
+        # Plain Python lists in the per-lead loop; converted to arrays once
+        title_masks = []
+        designation_length = []
+        designation_word_count = []
+        size_numeric = []
+        revenue_millions = []
+        activity_days = []
+        industry_flags = []
+        no_industry = (0,) * len(_INDUSTRY_RULES)
+
+        for rec in records:
+            linkedin_data = rec.get("linkedin_data")
+            user_data = rec.get("user_data") or {}
+
+            title_l = self._safe_lower(self._extract_title_from_linkedin(linkedin_data))
+            title_masks.append(_scan_title(title_l)[0] if self._need_title else 0)
+            designation_length.append(len(title_l))
+            designation_word_count.append(len(title_l.split()))
+
+            size_numeric.append(
+                self._parse_size_to_number(user_data.get("company_size", "") or "")
+                if self._need_size else 0
+            )
+            revenue_millions.append(
+                self._parse_revenue_millions(user_data.get("annual_revenue", "") or "")
+                if self._need_revenue else 0.0
+            )
+            industry_flags.append(
+                _classify_industry(self._safe_lower(user_data.get("industry", "") or ""))
+                if self._need_industry else no_industry
+            )
+
+            activity_raw = linkedin_data.get("activity_days", None) if linkedin_data else None
+            try:
+                activity_days.append(float(activity_raw))
+            except:
+                activity_days.append(math.nan)
+
+        n = len(records)
+        title_masks = np.array(title_masks, dtype=np.int64)
+        designation_length = np.array(designation_length, dtype=np.int64)
+        designation_word_count = np.array(designation_word_count, dtype=np.int64)
+        # float64: one absurd but parseable size ("1e20") overflows int64 and
+        # would abort the whole batch; exact for every realistic headcount
+        size_numeric = np.array(size_numeric, dtype=np.float64)
+        revenue_millions = np.array(revenue_millions, dtype=np.float64)
+        activity_days = np.array(activity_days, dtype=np.float64)
+        industry_flags = np.array(industry_flags, dtype=np.int64).reshape(n, len(_INDUSTRY_RULES))
+
+        # ---- Activity (vectorized) ----
+        activity_missing = np.isnan(activity_days)
+        activity_days = np.clip(np.where(activity_missing, 30.0, activity_days), 0, 180)
+
+        # ---- Title flags / scores: unpack masks, one matmul per score ----
+        title_flags = (title_masks[:, None] >> np.arange(len(_TITLE_FLAGS))) & 1
+        seniority_score = title_flags @ _SENIORITY_WEIGHTS
+        dept_score = title_flags @ _DEPT_WEIGHTS
+
+        # ---- Buckets / scores (same thresholds as the scalar path) ----
+        revenue_category = np.searchsorted(_REVENUE_BINS, revenue_millions, side="right")
+        # one-hots follow the size bucket, except 5000 sits in both of the top two
+        size_bucket = np.searchsorted(_SIZE_SCORE_BINS, size_numeric, side="right")
+        data = {
+            name: title_flags[:, bit]
+            for bit, (name, _, _, _) in enumerate(_TITLE_FLAGS)
         }
-
-        # add all model feature values
-        for col in features_df.columns:
-            debug_info[col] = features_df.iloc[0][col]
-
-        return features_df, debug_info
+        data.update({
+            "designation_length": designation_length,
+            "designation_word_count": designation_word_count,
+            "seniority_score": seniority_score,
+            "dept_score": dept_score,
+
+            "size_numeric": size_numeric,
+            "size_51_200": size_bucket == 1,
+            "size_201_500": size_bucket == 2,
+            "size_501_1000": size_bucket == 3,
+            "size_1001_5000": (size_bucket == 4) | (size_numeric == 5000),
+            "size_5000_plus": size_bucket == 5,
+
+            "revenue_millions": revenue_millions,
+            "revenue_category": revenue_category,
+
+            "activity_days": activity_days,
+            "is_active_week": (activity_days <= 7).astype(np.int64),
+            "is_active_month": (activity_days <= 30).astype(np.int64),
+
+            **{name: industry_flags[:, j] for j, name in enumerate(_INDUSTRY_COLUMNS)},
+
+            "Desig_Score": seniority_score + dept_score,
+            "Size_Score": size_bucket,
+            "Revenue_Score": np.where(revenue_millions > 0, revenue_category + 1, 0),
+            "Activity_Score": 5 - np.searchsorted(_ACTIVITY_SCORE_BINS, activity_days, side="left"),
+
+            "activity_missing": activity_missing.astype(np.int64),
+        })
+
+        features_df = pd.DataFrame({
+            col: arr.astype(_BATCH_DTYPES.get(col, np.int8), copy=False)
+            for col, arr in data.items()
+        })
+        if self.model_feature_names:
+            features_df = features_df.reindex(columns=self._columns, fill_value=0)
+        return features_df
@@ -8,13 +8,17 @@ Model Predictor
 
 import os
 import json
+import heapq
 import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 
 class ModelPredictor:
+    # (model_path, meta_path) -> (model mtime, meta mtime, model, metadata)
+    _MODEL_CACHE: Dict[Tuple[str, str], Tuple[float, float, Any, Dict]] = {}
+
     def __init__(self, model_path: str = "models/model.pkl", meta_path: str = "models/metadata.json"):
         self.model_path = model_path
         self.meta_path = meta_path
@@ -27,75 +31,172 @@ class ModelPredictor:
         self._load()
 
     def _load(self):
+        """
+        The unpickled model is cached per path at class level: Streamlit
+        builds a new predictor on every rerun, and only the first one (or
+        the first after either file changes) pays for joblib.load.
+        """
         if not os.path.exists(self.model_path):
             raise FileNotFoundError(f"Model not found: {self.model_path}")
 
         if not os.path.exists(self.meta_path):
             raise FileNotFoundError(f"Metadata not found: {self.meta_path}")
 
-        self.model = joblib.load(self.model_path)
+        key = (self.model_path, self.meta_path)
+        model_mtime = os.stat(self.model_path).st_mtime
+        meta_mtime = os.stat(self.meta_path).st_mtime
+        cached = ModelPredictor._MODEL_CACHE.get(key)
+
+        if cached is not None and cached[:2] == (model_mtime, meta_mtime):
+            self.model, self.metadata = cached[2], cached[3]
+        else:
+            self.model = joblib.load(self.model_path)
+
+            with open(self.meta_path, "r") as f:
+                self.metadata = json.load(f)
 
-        with open(self.meta_path, "r") as f:
-            self.metadata = json.load(f)
+            ModelPredictor._MODEL_CACHE[key] = (model_mtime, meta_mtime, self.model, self.metadata)
+
+        # Under a multi-worker server each worker scoring with every core
+        # oversubscribes the CPU: PREDICTOR_WORKER_MODE=serving pins the
+        # model to one thread (batch jobs leave it unset to use all cores)
+        if os.environ.get("PREDICTOR_WORKER_MODE") == "serving" and hasattr(self.model, "set_params"):
+            self.model.set_params(n_jobs=1)
 
         self.feature_names = self.metadata.get("feature_names", [])
         self.reverse_mapping = self.metadata.get("reverse_mapping", {})
 
+        # class index -> label, in predict_proba column order
+        n_classes = int(getattr(self.model, "n_classes_", len(self.reverse_mapping)))
+        self._labels = [self.reverse_mapping.get(str(idx), str(idx)) for idx in range(n_classes)]
+
+        # feature name -> column position, for building rows from dicts
+        self._feat_index = {name: i for i, name in enumerate(self.feature_names)}
+
+        # importances are fixed per model: sort them once, not per explanation
+        self._importance_items = []
+        if hasattr(self.model, "feature_importances_"):
+            self._importance_items = sorted(
+                zip(self.feature_names, self.model.feature_importances_),
+                key=lambda x: x[1], reverse=True
+            )
+
     def _prepare_features(self, features_df: pd.DataFrame) -> pd.DataFrame:
         """
         Align features to metadata order.
         Fill missing columns with 0.
         Keep NaN activity_days -> replace with 999 (like training)
         """
-        X = features_df.copy()
-
-        # add missing columns
-        for col in self.feature_names:
-            if col not in X.columns:
-                X[col] = 0
-
-        # keep only expected cols in correct order
-        X = X[self.feature_names]
+        # expected cols in correct order, missing -> 0 (returns a new frame)
+        X = features_df.reindex(columns=self.feature_names, fill_value=0)
 
         # handle NaN activity_days like training (fill 999 then clip)
         if "activity_days" in X.columns:
-            X["activity_days"] = pd.to_numeric(X["activity_days"], errors="coerce")
-            X["activity_days"] = X["activity_days"].fillna(999).clip(0, 180)
+            activity = pd.to_numeric(X["activity_days"], errors="coerce").fillna(999).clip(0, 180)
+            X["activity_days"] = activity
 
-            X["is_active_week"] = (X["activity_days"] <= 7).astype(int)
-            X["is_active_month"] = (X["activity_days"] <= 30).astype(int)
+            X["is_active_week"] = (activity <= 7).astype(int)
+            X["is_active_month"] = (activity <= 30).astype(int)
 
-        # ensure numeric
-        X = X.apply(pd.to_numeric, errors="coerce").fillna(0)
+        # ensure numeric (builder output already is; skip the per-column pass)
+        if not all(map(pd.api.types.is_numeric_dtype, X.dtypes)):
+            X = X.apply(pd.to_numeric, errors="coerce")
+        X = X.fillna(0)
 
         return X
 
-    def predict(self, features_df: pd.DataFrame) -> Optional[Dict]:
+    @staticmethod
+    def _to_float(v) -> float:
         try:
-            X = self._prepare_features(features_df)
+            return float(v)
+        except (TypeError, ValueError):
+            return float("nan")
 
-            probs = self.model.predict_proba(X)[0]
-            pred_idx = int(np.argmax(probs))
-            label = self.reverse_mapping.get(str(pred_idx), str(pred_idx))
+    def _prepare_row(self, features: Dict) -> np.ndarray:
+        """
+        Same alignment as _prepare_features for one {feature: value} dict
+        (e.g. DynamicFeatureBuilder.build_feature_dict), straight into a
+        (1, n_features) float32 array with no DataFrame in between.
+        """
+        row = np.zeros((1, len(self.feature_names)), dtype=np.float32)
+        feat_index = self._feat_index
+        for k, v in features.items():
+            i = feat_index.get(k)
+            if i is not None:
+                v = self._to_float(v)
+                row[0, i] = 0.0 if v != v else v
 
-            confidence = float(np.max(probs))
+        # handle NaN activity_days like training (fill 999 then clip)
+        i = feat_index.get("activity_days")
+        if i is not None:
+            activity = self._to_float(features.get("activity_days", 0))
+            activity = 999.0 if activity != activity else activity
+            activity = min(180.0, max(0.0, activity))
+            row[0, i] = activity
 
-            # probabilities dict
-            prob_dict = {}
-            for idx, p in enumerate(probs):
-                lab = self.reverse_mapping.get(str(idx), str(idx))
-                prob_dict[lab] = float(p)
+            if "is_active_week" in feat_index:
+                row[0, feat_index["is_active_week"]] = activity <= 7
+            if "is_active_month" in feat_index:
+                row[0, feat_index["is_active_month"]] = activity <= 30
 
-            return {
-                "priority": label,
-                "confidence": confidence,
-                "probabilities": prob_dict
-            }
+        return row
+
+    def predict(self, features: Union[pd.DataFrame, Dict]) -> Optional[Dict]:
+        """
+        features: single-row DataFrame, or a {feature: value} dict
+        """
+        try:
+            if isinstance(features, dict):
+                X = self._prepare_row(features)
+            else:
+                # plain float32 matrix: XGBoost skips its pandas conversion
+                X = self._prepare_features(features).to_numpy(dtype=np.float32)
+
+            probs = self.model.predict_proba(X)
+            return self._results_from_probs(probs)[0]
+
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            return None
+
+    def predict_batch(self, features_df: pd.DataFrame) -> Optional[List[Dict]]:
+        """
+        Score many leads (one row each) with a single predict_proba call.
+        Returns one result dict per row, same shape as predict().
+        """
+        try:
+            X = self._prepare_features(features_df).to_numpy(dtype=np.float32)
+            if len(X) == 0:
+                return []
+
+            probs = self.model.predict_proba(X)
+            return self._results_from_probs(probs)
 
         except Exception as e:
             print(f"Prediction error: {e}")
             return None
 
+    def _results_from_probs(self, probs: np.ndarray) -> List[Dict]:
+        labels = self._labels
+        if len(labels) != probs.shape[1]:
+            labels = [self.reverse_mapping.get(str(idx), str(idx)) for idx in range(probs.shape[1])]
+
+        # one argmax pass; confidence is read at that index, not a second max();
+        # one C-level conversion each instead of float() per element
+        pred_idx = probs.argmax(axis=1)
+        confidence = np.take_along_axis(probs, pred_idx[:, None], axis=1)[:, 0].tolist()
+        pred_idx = pred_idx.tolist()
+
+        return [
+            {
+                "priority": labels[i],
+                "confidence": c,
+                # probabilities dict
+                "probabilities": dict(zip(labels, row))
+            }
+            for i, c, row in zip(pred_idx, confidence, probs.tolist())
+        ]
+
     def get_feature_importance(self) -> Dict[str, float]:
         """
         Returns model feature importance (XGBoost).
@@ -103,32 +204,27 @@ class ModelPredictor:
         if self.model is None:
             return {}
 
-        if hasattr(self.model, "feature_importances_"):
-            imp = self.model.feature_importances_
-            importance_map = dict(zip(self.feature_names, imp))
-            # sort desc
-            importance_map = dict(sorted(importance_map.items(), key=lambda x: x[1], reverse=True))
-            return importance_map
-
-        return {}
+        # sorted desc at load time
+        return dict(self._importance_items)
 
     def explain_prediction(self, features_df: pd.DataFrame, top_n: int = 5) -> Dict:
         """
         Dynamic explanation based on top feature importance * value.
         """
-        X = self._prepare_features(features_df)
-        importance = self.get_feature_importance()
-
-        if not importance:
+        if not self._importance_items:
             return {"top_reasons": []}
 
+        # first row by position (columns are in feature_names order)
+        row = self._prepare_features(features_df).to_numpy()[0]
+        feat_index = self._feat_index
+
         reasons = []
-        for feat, imp in list(importance.items())[:30]:
-            val = float(X.iloc[0][feat])
+        for feat, imp in self._importance_items[:30]:
+            val = float(row[feat_index[feat]])
             score = imp * abs(val)
             reasons.append((feat, val, float(imp), float(score)))
 
-        reasons = sorted(reasons, key=lambda x: x[3], reverse=True)[:top_n]
+        reasons = heapq.nlargest(top_n, reasons, key=lambda x: x[3])
 
         return {
             "top_reasons": [